@@ -3,6 +3,7 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -10,13 +11,54 @@ load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite:///./sql_app.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False})
+# Pool sizing: keep DB_POOL_SIZE + DB_MAX_OVERFLOW >= THREADPOOL_SIZE (see main.py)
+# so sync routes never wait on a connection held by a thread waiting on them.
+engine_options = {"pool_pre_ping": True}
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+if _url.get_backend_name() == "sqlite":
+    engine_options["connect_args"] = {"check_same_thread": False}
+# In-memory SQLite uses SingletonThreadPool, which does not take these options.
+if _url.get_backend_name() != "sqlite" or _url.database not in (None, "", ":memory:"):
+    engine_options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", 20)),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 3600)),
+    )
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options)
+
+# The /health/db probe gets its own one-connection pool with short timeouts,
+# so it answers 503 quickly instead of queuing behind request traffic or
+# waiting on a hung database.
+DB_HEALTHCHECK_TIMEOUT = int(os.getenv("DB_HEALTHCHECK_TIMEOUT", 2))
+
+health_engine_options = {"pool_pre_ping": True}
+if _url.get_backend_name() == "sqlite":
+    health_engine_options["connect_args"] = {
+        "check_same_thread": False,
+        "timeout": DB_HEALTHCHECK_TIMEOUT,
+    }
+elif _url.get_driver_name() in ("psycopg2", "psycopg"):
+    health_engine_options["connect_args"] = {
+        "connect_timeout": DB_HEALTHCHECK_TIMEOUT,
+        "options": f"-c statement_timeout={DB_HEALTHCHECK_TIMEOUT * 1000}",
+    }
+if "pool_size" in engine_options:
+    health_engine_options.update(
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=DB_HEALTHCHECK_TIMEOUT,
+    )
+
+health_engine = create_engine(SQLALCHEMY_DATABASE_URL, **health_engine_options)
 
 SessionLocal = sessionmaker(
     autocommit = False, 
     autoflush=False,
+    # Committed objects are returned as-is; no reload on attribute access.
+    expire_on_commit=False,
     bind=engine)
 
 Base = declarative_base()
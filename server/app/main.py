@@ -1,19 +1,43 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from anyio import CapacityLimiter, to_thread
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 from . import models
-from .db.database import engine
+from .db.database import engine, health_engine
 from .routes import payments as payment_routes
 from .routes import users as user_routes
+from .services import payment_engine
+
+# Sync (`def`) routes and dependencies run on AnyIO's worker threads. Keep this
+# no larger than the DB pool capacity so threads never queue on connections.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 40))
+
 
-app = FastAPI(title="Payment Gateway API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    payment_engine.start_webhooks()
+    yield
+    # Off the event loop: this waits on in-flight deliveries.
+    await to_thread.run_sync(payment_engine.shutdown_webhooks)
 
+
+app = FastAPI(title="Payment Gateway API", version="1.0.0", lifespan=lifespan)
+
+# Middleware must be pure ASGI (a class with `async __call__(scope, receive, send)`),
+# like CORSMiddleware. Do not subclass BaseHTTPMiddleware or use
+# @app.middleware("http"): both wrap every request in extra tasks and streams.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 models.Base.metadata.create_all(bind=engine)
@@ -23,9 +47,32 @@ app.include_router(payment_routes.router)
 
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Payment Gateway API"}
 
 @app.get("/health")
-def healthcheck():
-	return {"status": "ok"}
\ No newline at end of file
+async def healthcheck():
+	return {"status": "ok"}
+
+
+# Kept separate from /health so liveness probes never check out a connection.
+# Runs on its own one-token limiter rather than the shared threadpool, so a
+# saturated request pool cannot delay the probe.
+_health_limiter = CapacityLimiter(1)
+
+
+def _ping_db() -> None:
+    with health_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+@app.get("/health/db")
+async def healthcheck_db():
+    try:
+        await to_thread.run_sync(_ping_db, limiter=_health_limiter)
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable",
+        )
+    return {"status": "ok"}
@@ -5,10 +5,12 @@ import uuid
 
 from sqlalchemy import (
 	Boolean,
+	CheckConstraint,
 	Column,
 	DateTime,
 	Enum,
 	ForeignKey,
+	Index,
 	Integer,
 	Numeric,
 	String,
@@ -35,6 +37,17 @@ class Payment(Base):
 	"""Persistent representation of a payment lifecycle."""
 
 	__tablename__ = "payments"
+	__table_args__ = (
+		# Cover the per-user list (ORDER BY created_at) and the summary
+		# GROUP BY without a separate sort or table scan. Reference lookups
+		# use the unique payment_reference index.
+		Index("ix_payments_user_created", "user_id", "created_at"),
+		Index("ix_payments_user_status", "user_id", "status"),
+		CheckConstraint("amount > 0", name="ck_payments_amount_positive"),
+	)
+	# Fetch server-generated timestamps via RETURNING on INSERT/UPDATE so a
+	# committed payment never needs a refresh to be serialised.
+	__mapper_args__ = {"eager_defaults": True}
 
 	id = Column(
 		String,
@@ -61,7 +74,6 @@ class Payment(Base):
 		String,
 		ForeignKey("users.id", ondelete="SET NULL"),
 		nullable=True,
-		index=True,
 	)
 	processing_started_at = Column(DateTime(timezone=True), nullable=True)
 	completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -98,9 +110,9 @@ class Payment(Base):
 		"PaymentEvent",
 		back_populates="payment",
 		cascade="all, delete-orphan",
-		lazy="joined",
+		lazy="select",
 	)
-	user = relationship("User", back_populates="payments", lazy="joined")
+	user = relationship("User", back_populates="payments")
 
 
 class PaymentEvent(Base):
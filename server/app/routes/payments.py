@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import logging
+import uuid
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime, timezone
 
 from app import models
@@ -21,22 +22,34 @@ router = APIRouter(prefix="/payments", tags=["Payments"])
 
 logger = logging.getLogger(__name__)
 
-
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 
+def _looks_like_uuid(identifier: str) -> bool:
+    """Cheap shape check for the canonical 36-char UUID form used for payment IDs."""
+    return len(identifier) == 36 and identifier.count("-") == 4
+
+
 def _get_payment_or_404(identifier: str, user_id: str, db: Session) -> Payment:
     """Fetch a payment by ID or Reference belonging to the current user or raise 404."""
-    from sqlalchemy import or_
-
-    payment = (
-        db.query(Payment)
-        .filter(
-            or_(Payment.id == identifier, Payment.payment_reference == identifier),
-            Payment.user_id == user_id,
+    payment = None
+    if _looks_like_uuid(identifier):
+        # Primary-key lookup; served from the identity map when already loaded.
+        payment = db.get(Payment, identifier, options=[selectinload(Payment.events)])
+        if payment is not None and payment.user_id != user_id:
+            payment = None
+
+    if payment is None:
+        # References are caller-chosen and may themselves be UUID-shaped.
+        stmt = lambda_stmt(
+            lambda: select(Payment)
+            .options(selectinload(Payment.events))
+            .where(
+                Payment.user_id == user_id,
+                Payment.payment_reference == identifier,
+            )
         )
-        .first()
-    )
+        payment = db.scalars(stmt).first()
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,35 +91,32 @@ def create_payment(
             detail=f"Payment reference '{payload.payment_reference}' already exists.",
         )
 
-    webhook_url = str(payload.webhook_url) if payload.webhook_url else None
-
     payment = Payment(
+        # Assigned up front so the id is known without a flush.
+        id=str(uuid.uuid4()),
         amount=payload.amount,
         currency=payload.currency,
         description=payload.description,
         customer_email=payload.customer_email,
         extra_data=payload.extra_data,
-        webhook_url=webhook_url,
+        webhook_url=payload.webhook_url,
         payment_reference=payload.payment_reference,
         user_id=current_user.id,
         status=PaymentStatus.CREATED,
     )
     db.add(payment)
 
-    # Record creation event
+    # Record creation event; attaching it through the relationship leaves
+    # `payment.events` populated, so the response needs no event query.
     event = PaymentEvent(
-        payment_id=payment.id,
+        payment=payment,
         from_status=PaymentStatus.CREATED,
         to_status=PaymentStatus.CREATED,
         reason="Payment initialised",
     )
-    # We need to flush to get payment.id before adding the event
-    db.flush()
-    event.payment_id = payment.id
     db.add(event)
 
     db.commit()
-    db.refresh(payment)
     return payment
 
 
@@ -125,14 +135,17 @@ def list_payments(
     current_user: models.User = Depends(get_current_user),
 ):
     """Paginated list of payments owned by the authenticated user."""
-    return (
-        db.query(Payment)
-        .filter(Payment.user_id == current_user.id)
+    user_id = current_user.id
+    # lambda_stmt caches the constructed statement; only the bound values vary.
+    stmt = lambda_stmt(
+        lambda: select(Payment)
+        .options(selectinload(Payment.events))
+        .where(Payment.user_id == user_id)
         .order_by(Payment.created_at.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return db.scalars(stmt).all()
 
 
 # ── Summary ───────────────────────────────────────────────────────────────────
@@ -152,25 +165,32 @@ def get_summary(
 
     Returns total counts per status and a breakdown of failure reasons.
     """
+    # One pass over (status, failure_reason) groups yields both breakdowns.
     rows = (
-        db.query(Payment.status, func.count(Payment.id))
-        .filter(Payment.user_id == current_user.id)
-        .group_by(Payment.status)
-        .all()
-    )
-    counts: dict[str, int] = {r[0]: r[1] for r in rows}
-
-    # Failure reason breakdown
-    failure_rows = (
-        db.query(Payment.failure_reason, func.count(Payment.id))
-        .filter(
-            Payment.user_id == current_user.id,
-            Payment.failure_reason.isnot(None),
+        db.query(
+            Payment.status,
+            Payment.failure_reason,
+            func.count(Payment.id),
+            func.max(Payment.updated_at),
         )
-        .group_by(Payment.failure_reason)
+        .filter(Payment.user_id == current_user.id)
+        .group_by(Payment.status, Payment.failure_reason)
         .all()
     )
-    failure_breakdown = {r[0]: r[1] for r in failure_rows}
+    counts: dict[str, int] = {}
+    failure_breakdown: dict[str, int] = {}
+    last_updated = None
+    for status_, reason, n, updated_at in rows:
+        counts[status_] = counts.get(status_, 0) + n
+        if reason is not None:
+            failure_breakdown[reason] = failure_breakdown.get(reason, 0) + n
+        if updated_at is not None and (last_updated is None or updated_at > last_updated):
+            last_updated = updated_at
+    if last_updated is None:
+        last_updated = datetime.now(timezone.utc)
+    elif last_updated.tzinfo is None:
+        # SQLite hands back naive timestamps; CURRENT_TIMESTAMP is UTC.
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
 
     return schemas.PaymentSummary(
         total=sum(counts.values()),
@@ -180,7 +200,7 @@ def get_summary(
         processing=counts.get(PaymentStatus.PROCESSING, 0),
         created=counts.get(PaymentStatus.CREATED, 0),
         failure_breakdown=failure_breakdown,
-        last_updated=datetime.now(timezone.utc),
+        last_updated=last_updated,
     )
 
 
@@ -2,17 +2,22 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Literal
+from typing import Annotated, Any, Dict, List, Optional, Literal
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, condecimal, constr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, StringConstraints
 
 from ..models.models import PaymentStatus
 
 
-AmountType = condecimal(gt=Decimal("0.00"), max_digits=12, decimal_places=2)
-BalanceType = condecimal(ge=Decimal("0.00"), max_digits=14, decimal_places=2)
+AmountType = Annotated[Decimal, Field(gt=Decimal("0.00"), max_digits=12, decimal_places=2)]
+BalanceType = Annotated[Decimal, Field(ge=Decimal("0.00"), max_digits=14, decimal_places=2)]
 CurrencyType = Literal["USD", "EUR", "GBP", "INR", "JPY", "AUD"]
-PasswordType = constr(strip_whitespace=True, min_length=8, max_length=128)
+PasswordType = Annotated[str, StringConstraints(strip_whitespace=True, min_length=8, max_length=128)]
+BankNumberType = Annotated[str, StringConstraints(strip_whitespace=True, min_length=4, max_length=64)]
+CardLastFourType = Annotated[str, StringConstraints(strip_whitespace=True, min_length=4, max_length=4)]
+PaymentReferenceType = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=64)]
+# Scheme + host shape check only; httpx parses the URL again on delivery.
+WebhookUrlType = Annotated[str, StringConstraints(pattern=r"^[Hh][Tt][Tt][Pp][Ss]?://[^\s/?#]+\S*$", max_length=255)]
 
 
 class Token(BaseModel):
@@ -29,9 +34,9 @@ class UserBase(BaseModel):
 	full_name: Optional[str] = None
 	preferred_currency: CurrencyType = "USD"
 	bank_name: Optional[str] = None
-	bank_account_number: Optional[constr(strip_whitespace=True, min_length=4, max_length=64)] = None
-	bank_routing_number: Optional[constr(strip_whitespace=True, min_length=4, max_length=64)] = None
-	card_last_four: Optional[constr(strip_whitespace=True, min_length=4, max_length=4)] = None
+	bank_account_number: Optional[BankNumberType] = None
+	bank_routing_number: Optional[BankNumberType] = None
+	card_last_four: Optional[CardLastFourType] = None
 	available_balance: BalanceType = Decimal("0.00")
 
 
@@ -44,9 +49,9 @@ class UserUpdate(BaseModel):
 	full_name: Optional[str] = None
 	preferred_currency: Optional[CurrencyType] = None
 	bank_name: Optional[str] = None
-	bank_account_number: Optional[constr(strip_whitespace=True, min_length=4, max_length=64)] = None
-	bank_routing_number: Optional[constr(strip_whitespace=True, min_length=4, max_length=64)] = None
-	card_last_four: Optional[constr(strip_whitespace=True, min_length=4, max_length=4)] = None
+	bank_account_number: Optional[BankNumberType] = None
+	bank_routing_number: Optional[BankNumberType] = None
+	card_last_four: Optional[CardLastFourType] = None
 	available_balance: Optional[BalanceType] = None
 	password: Optional[PasswordType] = None
 
@@ -71,12 +76,13 @@ class PaymentBase(BaseModel):
 	currency: CurrencyType = "USD"
 	description: Optional[str] = Field(default=None, max_length=255)
 	customer_email: Optional[EmailStr] = None
-	extra_data: Optional[Dict[str, Any]] = Field(default=None)
-	webhook_url: Optional[HttpUrl] = None
+	# Bare `dict`: JSON object keys are always strings, so skip per-key checks.
+	extra_data: Optional[dict] = Field(default=None)
+	webhook_url: Optional[WebhookUrlType] = None
 
 
 class PaymentCreate(PaymentBase):
-	payment_reference: constr(strip_whitespace=True, min_length=1, max_length=64)
+	payment_reference: PaymentReferenceType
 
 
 class PaymentStatusUpdate(BaseModel):
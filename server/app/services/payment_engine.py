@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import logging
 import random
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Tuple
@@ -20,6 +23,19 @@ logger = logging.getLogger(__name__)
 FRAUD_AMOUNT_THRESHOLD = Decimal("10000.00")
 SUCCESS_PROBABILITY = 0.70          # 70 % random success rate
 MAX_RETRY_COUNT = 3                  # hard limit on retries
+WEBHOOK_TIMEOUT_SECONDS = 5.0
+WEBHOOK_CONNECT_TIMEOUT_SECONDS = 1.0
+WEBHOOK_WORKERS = 4
+MAX_PENDING_WEBHOOKS = 256           # oldest queued delivery dropped beyond this
+
+# Threshold part formatted once; only the amount varies per payment.
+_FRAUD_REASON_TMPL = (
+    "FRAUD_DETECTED – amount {} exceeds threshold of " + str(FRAUD_AMOUNT_THRESHOLD)
+)
+
+# Engine-private RNG for the simulated outcome, bound once; unaffected by
+# other code reseeding the global `random` module.
+_random = random.Random().random
 
 # Allowed state transitions: from_status → set of valid to_status
 _TRANSITIONS: dict[PaymentStatus, set[PaymentStatus]] = {
@@ -29,13 +45,17 @@ _TRANSITIONS: dict[PaymentStatus, set[PaymentStatus]] = {
     PaymentStatus.FAILED:      {PaymentStatus.PROCESSING},
     PaymentStatus.REFUNDED:    set(),
 }
+# Flattened to (from, to) pairs: one hash probe per check, no default set built.
+_ALLOWED_TRANSITIONS: frozenset[tuple[PaymentStatus, PaymentStatus]] = frozenset(
+    (src, dst) for src, dsts in _TRANSITIONS.items() for dst in dsts
+)
 
 
 # ── State machine helpers ─────────────────────────────────────────────────────
 
 
 def _can_transition(from_status: PaymentStatus, to_status: PaymentStatus) -> bool:
-    return to_status in _TRANSITIONS.get(from_status, set())
+    return (from_status, to_status) in _ALLOWED_TRANSITIONS
 
 
 def _record_event(
@@ -46,8 +66,10 @@ def _record_event(
     reason: str | None = None,
     payload: dict | None = None,
 ) -> PaymentEvent:
+    # Set via the relationship so an already-loaded `payment.events` stays
+    # current after commit; an unloaded collection is not fetched.
     event = PaymentEvent(
-        payment_id=payment.id,
+        payment=payment,
         from_status=from_status,
         to_status=to_status,
         reason=reason,
@@ -81,7 +103,6 @@ def _set_status(
         payment.failure_reason = reason
     if new_status in (PaymentStatus.SUCCESS, PaymentStatus.REFUNDED):
         payment.failure_reason = None
-    db.flush()
 
 
 # ── Fraud / rule evaluation ───────────────────────────────────────────────────
@@ -92,20 +113,18 @@ def evaluate_rules(payment: Payment) -> Tuple[bool, str | None, str | None]:
     Return (should_fail, failure_reason, rule_triggered).
     Rules are evaluated in priority order; first match wins.
     """
-    amount = Decimal(str(payment.amount))
+    amount = payment.amount
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
 
     # Rule 1 — Fraud: amount exceeds threshold
     if amount > FRAUD_AMOUNT_THRESHOLD:
         return (
             True,
-            f"FRAUD_DETECTED – amount {amount} exceeds threshold of {FRAUD_AMOUNT_THRESHOLD}",
+            _FRAUD_REASON_TMPL.format(amount),
             "FRAUD_HIGH_AMOUNT",
         )
 
-    # Rule 2 — Zero / negative amount (belt-and-suspenders; schema enforces > 0)
-    if amount <= Decimal("0"):
-        return True, "INVALID_AMOUNT – amount must be positive", "INVALID_AMOUNT"
-
     # No rules triggered
     return False, None, None
 
@@ -113,16 +132,76 @@ def evaluate_rules(payment: Payment) -> Tuple[bool, str | None, str | None]:
 # ── Webhook dispatch ──────────────────────────────────────────────────────────
 
 
-def fire_webhook(url: str, payload: dict) -> None:
+# Shared across deliveries so repeat calls to the same host reuse keep-alive
+# connections instead of paying TCP/TLS setup each time. Deliveries run on
+# their own small pool so a slow or unreachable receiver never occupies the
+# request threadpool or delays the HTTP response. Both are opened per app
+# lifespan by start_webhooks() and released by shutdown_webhooks().
+_http_client: httpx.Client | None = None
+_webhook_pool: ThreadPoolExecutor | None = None
+_pending_webhooks: deque[Future] = deque()
+_webhook_lock = threading.Lock()
+
+
+def _open_webhooks() -> tuple[httpx.Client, ThreadPoolExecutor]:
+    """Open the shared client and pool if needed; caller holds _webhook_lock."""
+    global _http_client, _webhook_pool
+    if _webhook_pool is None:
+        _http_client = httpx.Client(
+            # Fail fast on unreachable hosts; allow slow receivers the full budget.
+            timeout=httpx.Timeout(WEBHOOK_TIMEOUT_SECONDS, connect=WEBHOOK_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=128, max_keepalive_connections=64),
+        )
+        _webhook_pool = ThreadPoolExecutor(max_workers=WEBHOOK_WORKERS, thread_name_prefix="webhook")
+    return _http_client, _webhook_pool
+
+
+def fire_webhook(client: httpx.Client, url: str, payload: dict) -> None:
     """Best-effort HTTP POST to the configured webhook URL (synchronous)."""
     try:
-        with httpx.Client(timeout=5.0) as client:
-            resp = client.post(url, json=payload)
-            logger.info("Webhook %s → HTTP %s", url, resp.status_code)
+        resp = client.post(url, json=payload)
+        logger.info("Webhook %s → HTTP %s", url, resp.status_code)
     except Exception as exc:  # noqa: BLE001
         logger.warning("Webhook delivery failed for %s: %s", url, exc)
 
 
+def _dispatch_webhook(url: str, payload: dict) -> None:
+    """Queue a delivery without waiting on it, shedding the oldest when backlogged."""
+    with _webhook_lock:
+        # Opened lazily too, for apps driven without a lifespan.
+        client, pool = _open_webhooks()
+        while _pending_webhooks and _pending_webhooks[0].done():
+            _pending_webhooks.popleft()
+        if len(_pending_webhooks) >= MAX_PENDING_WEBHOOKS:
+            if _pending_webhooks.popleft().cancel():
+                logger.warning("Webhook backlog full; dropped oldest queued delivery")
+        try:
+            _pending_webhooks.append(pool.submit(fire_webhook, client, url, payload))
+        except RuntimeError as exc:  # interpreter shutting down
+            logger.warning("Webhook not queued for %s: %s", url, exc)
+
+
+def start_webhooks() -> None:
+    """Open the webhook client and delivery pool for this app lifespan."""
+    with _webhook_lock:
+        _open_webhooks()
+
+
+def shutdown_webhooks() -> None:
+    """Drop queued deliveries, give in-flight ones one timeout to finish, then close."""
+    global _http_client, _webhook_pool
+    with _webhook_lock:
+        client, pool = _http_client, _webhook_pool
+        _http_client = _webhook_pool = None
+        pending = list(_pending_webhooks)
+        _pending_webhooks.clear()
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+        wait(pending, timeout=WEBHOOK_TIMEOUT_SECONDS)
+    if client is not None:
+        client.close()
+
+
 # ── Public API ────────────────────────────────────────────────────────────────
 
 
@@ -131,7 +210,7 @@ def process_payment(payment: Payment, db: Session) -> Payment:
     Run the full processing pipeline:
       CREATED → PROCESSING → SUCCESS | FAILED
 
-    Also fires an optional webhook on completion.
+    Also queues an optional webhook on completion.
     Raises ValueError for invalid state transitions.
     """
     if payment.status not in (PaymentStatus.CREATED, PaymentStatus.FAILED):
@@ -152,7 +231,7 @@ def process_payment(payment: Payment, db: Session) -> Payment:
         _set_status(db, payment, PaymentStatus.FAILED, reason=failure_reason)
     else:
         # Random outcome (time/random-based simulation)
-        if random.random() < SUCCESS_PROBABILITY:
+        if _random() < SUCCESS_PROBABILITY:
             _set_status(db, payment, PaymentStatus.SUCCESS)
         else:
             reason = "PROCESSING_ERROR – random transient failure"
@@ -160,9 +239,8 @@ def process_payment(payment: Payment, db: Session) -> Payment:
             _set_status(db, payment, PaymentStatus.FAILED, reason=reason)
 
     db.commit()
-    db.refresh(payment)
 
-    # Fire webhook (best-effort, after commit)
+    # Queue webhook (best-effort, after commit)
     if payment.webhook_url:
         webhook_payload = {
             "event": "payment.status_changed",
@@ -172,7 +250,7 @@ def process_payment(payment: Payment, db: Session) -> Payment:
             "failure_reason": payment.failure_reason,
             "rule_triggered": payment.rule_triggered,
         }
-        fire_webhook(str(payment.webhook_url), webhook_payload)
+        _dispatch_webhook(payment.webhook_url, webhook_payload)
 
     return payment
 
@@ -185,11 +263,10 @@ def refund_payment(payment: Payment, db: Session) -> Payment:
         )
     _set_status(db, payment, PaymentStatus.REFUNDED, reason="Customer-initiated refund")
     db.commit()
-    db.refresh(payment)
 
     if payment.webhook_url:
-        fire_webhook(
-            str(payment.webhook_url),
+        _dispatch_webhook(
+            payment.webhook_url,
             {
                 "event": "payment.refunded",
                 "payment_id": payment.id,
@@ -211,5 +288,4 @@ def retry_payment(payment: Payment, db: Session) -> Payment:
             f"Maximum retry count ({MAX_RETRY_COUNT}) reached for this payment."
         )
     payment.retry_count += 1
-    db.flush()
     return process_payment(payment, db)
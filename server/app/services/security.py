@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
+import os
+
 import bcrypt
 
+# Work factor for new hashes. Lower it (min 4) in dev/test to speed up auth;
+# existing hashes keep the cost they were created with.
+BCRYPT_COST = int(os.getenv("BCRYPT_COST", "12"))
+
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+_BCRYPT_HASH_LENGTH = 60
+
 
 def hash_password(password: str) -> str:
     """Generate a salted bcrypt hash for the provided password."""
     if not password:
         raise ValueError("Password must be non-empty")
 
-    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(BCRYPT_COST))
     return hashed.decode("utf-8")
 
 
@@ -18,6 +27,9 @@ def verify_password(password: str, encoded_hash: str) -> bool:
     """Constant-time verification of a password against its stored bcrypt hash."""
     if not password or not encoded_hash:
         return False
+    # Reject malformed hashes before paying the bcrypt work factor.
+    if len(encoded_hash) != _BCRYPT_HASH_LENGTH or not encoded_hash.startswith(_BCRYPT_PREFIXES):
+        return False
     try:
         return bcrypt.checkpw(password.encode("utf-8"), encoded_hash.encode("utf-8"))
     except (ValueError, TypeError):